@@ -14,8 +14,37 @@ DEFAULT_LIMIT = 100
 # db_dialects
 POSTGRES_DIALECT = "postgresql+psycopg"
 
+# number of rows sent in one multi-row INSERT during bulk inserts (e.g. samples of the project).
+# samples table has 7 insert parameters, so 5000 rows stay below postgres limit of 65535 parameters
+INSERT_MANY_VALUES_PAGE_SIZE = 5000
+
+# number of executions of the same query after which psycopg prepares it on the server side
+DEFAULT_PREPARE_THRESHOLD = 3
+
+# connection pool settings. Connections are checked (pre ping) before use
+# and recycled after POOL_RECYCLE seconds, so connections closed by server or proxy are not reused
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_OVERFLOW = 20
+POOL_TIMEOUT = 30
+POOL_RECYCLE = 1800
+
 DEFAULT_LIMIT_INFO = 5
 
+# annotation cache is disabled by default (ttl in seconds)
+DEFAULT_ANNOTATION_CACHE_TTL = 0
+DEFAULT_ANNOTATION_CACHE_SIZE = 4096
+
+# schema cache is disabled by default (ttl in seconds)
+DEFAULT_SCHEMA_CACHE_TTL = 0
+DEFAULT_SCHEMA_CACHE_SIZE = 1024
+
+# number of rows fetched at once from server side cursor, when large search pages are streamed
+STREAM_YIELD_PER = 500
+
+# postgres to_char format of project dates: date, time with microseconds and UTC offset.
+# Unlike str() of python datetime, microseconds are kept when they are zero (.000000)
+DATETIME_SQL_FORMAT = "YYYY-MM-DD HH24:MI:SS.USTZH:TZM"
+
 SUBMISSION_DATE_KEY = "submission_date"
 LAST_UPDATE_DATE_KEY = "last_update_date"
 
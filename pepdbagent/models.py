@@ -28,7 +28,7 @@ class AnnotationModel(BaseModel):
     namespace: Optional[str]
     name: Optional[str]
     tag: Optional[str]
-    is_private: Optional[bool]
+    is_private: bool = False
     number_of_samples: Optional[int]
     description: Optional[str]
     last_update_date: Optional[str]
@@ -44,12 +44,11 @@ class AnnotationModel(BaseModel):
         populate_by_name=True,
     )
 
-    @field_validator("is_private")
+    @field_validator("is_private", mode="before")
     def is_private_should_be_bool(cls, v):
-        if not isinstance(v, bool):
+        if v is None:
             return False
-        else:
-            return v
+        return v
 
 
 class AnnotationList(BaseModel):
@@ -1,12 +1,13 @@
 import logging
 from datetime import datetime
-from typing import List, Literal, Optional, Union
+from typing import List, Literal, Optional, Tuple, Union
 
-from sqlalchemy import and_, func, or_, select
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, RowMapping, and_, func, or_, select, tuple_
+from sqlalchemy.orm import aliased
 from sqlalchemy.sql.selectable import Select
 
 from pepdbagent.const import (
+    DATETIME_SQL_FORMAT,
     DEFAULT_LIMIT,
     DEFAULT_OFFSET,
     DEFAULT_TAG,
@@ -14,14 +15,88 @@ from pepdbagent.const import (
     PKG_NAME,
     SUBMISSION_DATE_KEY,
 )
-from pepdbagent.db_utils import BaseEngine, Projects
+from pepdbagent.db_utils import BaseEngine, Projects, Schemas
 from pepdbagent.exceptions import FilterError, ProjectNotFoundError, RegistryPathError
 from pepdbagent.models import AnnotationList, AnnotationModel, RegistryPath
-from pepdbagent.utils import convert_date_string_to_date, registry_path_converter, tuple_converter
+from pepdbagent.utils import (
+    convert_date_string_to_date,
+    registry_path_converter,
+    search_count,
+    stream_large_page,
+    tuple_converter,
+)
 
 _LOGGER = logging.getLogger(PKG_NAME)
 
 
+def select_annotation(*columns) -> Select:
+    """
+    Create select statement with all project columns that are needed for annotation.
+    Schema and parent (forked from) project are outer joined, so annotations
+    are retrieved in one query without loading ORM objects.
+    Dates are formatted to strings by the database.
+
+    :param columns: additional columns to select
+    :return: sqlalchemy representation of a SELECT statement.
+    """
+    forked_from = aliased(Projects)
+    return (
+        select(
+            Projects.namespace,
+            Projects.name,
+            Projects.tag,
+            Projects.private,
+            Projects.description,
+            Projects.number_of_samples,
+            func.to_char(Projects.submission_date, DATETIME_SQL_FORMAT).label("submission_date"),
+            func.to_char(Projects.last_update_date, DATETIME_SQL_FORMAT).label("last_update_date"),
+            Projects.digest,
+            Projects.pop,
+            Projects.number_of_stars,
+            Schemas.namespace.label("schema_namespace"),
+            Schemas.name.label("schema_name"),
+            forked_from.namespace.label("forked_from_namespace"),
+            forked_from.name.label("forked_from_name"),
+            forked_from.tag.label("forked_from_tag"),
+            *columns,
+        )
+        .select_from(Projects)
+        .outerjoin(Schemas, Projects.schema_id == Schemas.id)
+        .outerjoin(forked_from, Projects.forked_from_id == forked_from.id)
+    )
+
+
+def annotation_from_row(row: RowMapping) -> AnnotationModel:
+    """
+    Create annotation model from the row of select_annotation statement.
+    Rows come from typed columns, so validation is skipped.
+
+    :param row: row mapping of the select_annotation statement
+    :return: pydantic Annotation Model
+    """
+    return AnnotationModel.model_construct(
+        namespace=row["namespace"],
+        name=row["name"],
+        tag=row["tag"],
+        is_private=row["private"],
+        description=row["description"],
+        number_of_samples=row["number_of_samples"],
+        submission_date=row["submission_date"],
+        last_update_date=row["last_update_date"],
+        digest=row["digest"],
+        pep_schema=(
+            f"{row['schema_namespace']}/{row['schema_name']}" if row["schema_name"] else None
+        ),
+        pop=row["pop"],
+        stars_number=row["number_of_stars"],
+        forked_from=(
+            f"{row['forked_from_namespace']}/{row['forked_from_name']}:{row['forked_from_tag']}"
+            if row["forked_from_name"]
+            else None
+        ),
+    )
+
+
 class PEPDatabaseAnnotation:
     """
     Class that represents project Annotations in the Database.
@@ -100,26 +175,28 @@ class PEPDatabaseAnnotation:
         if pep_type not in [None, "pep", "pop"]:
             raise ValueError(f"pep_type should be one of ['pep', 'pop'], got {pep_type}")
 
-        return AnnotationList(
-            limit=limit,
+        count, results = self._search_projects(
+            namespace=namespace,
+            search_str=query,
+            admin=admin,
             offset=offset,
-            count=self._count_projects(
-                namespace=namespace,
-                search_str=query,
-                admin=admin,
-                filter_by=filter_by,
-                filter_end_date=filter_end_date,
-                filter_start_date=filter_start_date,
-                pep_type=pep_type,
-            ),
-            results=self._get_projects(
+            limit=limit,
+            order_by=order_by,
+            order_desc=order_desc,
+            filter_by=filter_by,
+            filter_end_date=filter_end_date,
+            filter_start_date=filter_start_date,
+            pep_type=pep_type,
+        )
+        count = search_count(
+            count,
+            results,
+            offset,
+            limit,
+            lambda: self._count_projects(
                 namespace=namespace,
                 search_str=query,
                 admin=admin,
-                offset=offset,
-                limit=limit,
-                order_by=order_by,
-                order_desc=order_desc,
                 filter_by=filter_by,
                 filter_end_date=filter_end_date,
                 filter_start_date=filter_start_date,
@@ -127,6 +204,13 @@ class PEPDatabaseAnnotation:
             ),
         )
 
+        return AnnotationList(
+            limit=limit,
+            offset=offset,
+            count=count,
+            results=results,
+        )
+
     def get_by_rp(
         self,
         registry_paths: Union[List[str], str],
@@ -143,19 +227,28 @@ class PEPDatabaseAnnotation:
             result: List [AnnotationModel])
         """
         if isinstance(registry_paths, list):
-            anno_results = []
+            keys = []
             for path in registry_paths:
                 try:
-                    namespace, name, tag = registry_path_converter(path)
+                    keys.append(registry_path_converter(path))
                 except RegistryPathError as err:
                     _LOGGER.error(str(err), registry_paths)
                     continue
-                try:
-                    single_return = self._get_single_annotation(namespace, name, tag, admin)
-                    if single_return:
-                        anno_results.append(single_return)
-                except ProjectNotFoundError:
-                    pass
+
+            anno_results = []
+            if keys:
+                statement = select_annotation().where(
+                    and_(
+                        tuple_(Projects.namespace, Projects.name, Projects.tag).in_(keys),
+                        self._visibility_clause(admin),
+                    )
+                )
+                with self._sa_engine.connect() as conn:
+                    by_key = {
+                        (row["namespace"], row["name"], row["tag"]): annotation_from_row(row)
+                        for row in conn.execute(statement).mappings()
+                    }
+                anno_results = [by_key[key] for key in keys if key in by_key]
             return_len = len(anno_results)
             return AnnotationList(
                 count=return_len,
@@ -184,52 +277,30 @@ class PEPDatabaseAnnotation:
         :return: pydantic Annotation Model of annotations of current project
         """
         _LOGGER.info(f"Getting annotation of the project: '{namespace}/{name}:{tag}'")
-        admin_tuple = tuple_converter(admin)
+        cached = self._pep_db_engine.annotation_cache.get((namespace, name, tag))
+        if cached is not None:
+            if cached.is_private and namespace not in tuple_converter(admin):
+                raise ProjectNotFoundError(f"Project '{namespace}/{name}:{tag}' was not found.")
+            return cached.model_copy()
 
-        statement = select(Projects).where(
+        statement = select_annotation().where(
             and_(
                 Projects.name == name,
                 Projects.namespace == namespace,
                 Projects.tag == tag,
-                or_(
-                    Projects.namespace.in_(admin_tuple),
-                    Projects.private.is_(False),
-                ),
+                self._visibility_clause(admin),
             )
         )
-        with Session(self._sa_engine) as session:
-            query_result = session.scalar(statement)
-
-            if query_result:
-                annot = AnnotationModel(
-                    namespace=query_result.namespace,
-                    name=query_result.name,
-                    tag=query_result.tag,
-                    is_private=query_result.private,
-                    description=query_result.description,
-                    number_of_samples=query_result.number_of_samples,
-                    submission_date=str(query_result.submission_date),
-                    last_update_date=str(query_result.last_update_date),
-                    digest=query_result.digest,
-                    pep_schema=(
-                        f"{query_result.schema_mapping.namespace}/{query_result.schema_mapping.name}"
-                        if query_result.schema_mapping
-                        else None
-                    ),
-                    pop=query_result.pop,
-                    stars_number=query_result.number_of_stars,
-                    forked_from=(
-                        f"{query_result.forked_from_mapping.namespace}/{query_result.forked_from_mapping.name}:{query_result.forked_from_mapping.tag}"
-                        if query_result.forked_from_id
-                        else None
-                    ),
-                )
-                _LOGGER.info(
-                    f"Annotation of the project '{namespace}/{name}:{tag}' has been found!"
-                )
-                return annot
-            else:
-                raise ProjectNotFoundError(f"Project '{namespace}/{name}:{tag}' was not found.")
+        with self._sa_engine.connect() as conn:
+            row = conn.execute(statement).mappings().first()
+
+        if row is None:
+            raise ProjectNotFoundError(f"Project '{namespace}/{name}:{tag}' was not found.")
+
+        _LOGGER.info(f"Annotation of the project '{namespace}/{name}:{tag}' has been found!")
+        annotation = annotation_from_row(row)
+        self._pep_db_engine.annotation_cache.set((namespace, name, tag), annotation.model_copy())
+        return annotation
 
     def _count_projects(
         self,
@@ -242,7 +313,7 @@ class PEPDatabaseAnnotation:
         pep_type: Optional[Literal["pep", "pop"]] = None,
     ) -> int:
         """
-        Count projects. [This function is related to _find_projects]
+        Count projects. [This function is related to _search_projects]
 
         :param namespace: namespace where to search for a project
         :param search_str: search string. will be searched in name, tag and description information
@@ -270,14 +341,10 @@ class PEPDatabaseAnnotation:
         )
         if pep_type:
             statement = statement.where(Projects.pop.is_(pep_type == "pop"))
-        result = self._pep_db_engine.session_execute(statement).first()
-
-        try:
-            return result[0]
-        except IndexError:
-            return 0
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
-    def _get_projects(
+    def _search_projects(
         self,
         namespace: str = None,
         search_str: str = None,
@@ -290,9 +357,10 @@ class PEPDatabaseAnnotation:
         filter_start_date: Optional[str] = None,
         filter_end_date: Optional[str] = None,
         pep_type: Optional[Literal["pep", "pop"]] = None,
-    ) -> List[AnnotationModel]:
+    ) -> Tuple[int, List[AnnotationModel]]:
         """
-        Get projects by providing search string.
+        Get projects by providing search string, together with the total number of found projects.
+        Total number is calculated in the same query using window function.
 
         :param namespace: namespace where to search for a project
         :param search_str: search string that has to be found in the name or tag
@@ -309,13 +377,13 @@ class PEPDatabaseAnnotation:
         :param filter_start_date: Filter start date. Format: "YYYY:MM:DD"
         :param filter_end_date: Filter end date. Format: "YYYY:MM:DD". if None: present date will be used
         :param pep_type: Get pep with specified type. Options: ["pep", "pop"]. Default: None, get all peps
-        :return: list of found projects with their annotations.
+        :return: tuple of total number of found projects and list of found projects with their annotations.
         """
         _LOGGER.info(f"Running annotation search: (namespace: {namespace}, query: {search_str}.")
 
         if admin is None:
             admin = []
-        statement = select(Projects)
+        statement = select_annotation(func.count().over().label("total_count"))
 
         statement = self._add_condition(
             statement,
@@ -330,37 +398,16 @@ class PEPDatabaseAnnotation:
         statement = statement.limit(limit).offset(offset)
         if pep_type:
             statement = statement.where(Projects.pop.is_(pep_type == "pop"))
+        statement = stream_large_page(statement, limit)
 
+        count = 0
         results_list = []
-        with Session(self._sa_engine) as session:
-            results = session.scalars(statement)
-            for result in results:
-                results_list.append(
-                    AnnotationModel(
-                        namespace=result.namespace,
-                        name=result.name,
-                        tag=result.tag,
-                        is_private=result.private,
-                        description=result.description,
-                        number_of_samples=result.number_of_samples,
-                        submission_date=str(result.submission_date),
-                        last_update_date=str(result.last_update_date),
-                        digest=result.digest,
-                        pep_schema=(
-                            f"{result.schema_mapping.namespace}/{result.schema_mapping.name}"
-                            if result.schema_mapping
-                            else None
-                        ),
-                        pop=result.pop,
-                        stars_number=result.number_of_stars,
-                        forked_from=(
-                            f"{result.forked_from_mapping.namespace}/{result.forked_from_mapping.name}:{result.forked_from_mapping.tag}"
-                            if result.forked_from_id
-                            else None
-                        ),
-                    )
-                )
-        return results_list
+        with self._sa_engine.connect() as conn:
+            results = conn.execute(statement)
+            for result in results.mappings():
+                count = result["total_count"]
+                results_list.append(annotation_from_row(result))
+        return count, results_list
 
     @staticmethod
     def _add_order_by_keyword(
@@ -414,24 +461,36 @@ class PEPDatabaseAnnotation:
         :param admin_list: list or string of admin rights to namespace
         :return: sqlalchemy representation of a SELECT statement with where clause.
         """
-        admin_list = tuple_converter(admin_list)
         if search_str:
-            sql_search_str = f"%{search_str}%"
+            # lower(column) LIKE lower(pattern) is served by trigram indexes on lower(column)
+            sql_search_str = func.lower(f"%{search_str}%")
             search_query = or_(
-                Projects.name.ilike(sql_search_str),
-                Projects.tag.ilike(sql_search_str),
-                Projects.description.ilike(sql_search_str),
+                func.lower(Projects.name).like(sql_search_str),
+                func.lower(Projects.tag).like(sql_search_str),
+                func.lower(Projects.description).like(sql_search_str),
             )
             statement = statement.where(search_query)
         if namespace:
             statement = statement.where(Projects.namespace == namespace)
 
-        statement = statement.where(
-            or_(Projects.private.is_(False), Projects.namespace.in_(admin_list))
-        )
+        if admin_list:
+            statement = statement.where(PEPDatabaseAnnotation._visibility_clause(admin_list))
+        else:
+            # without admin rights, condition matches partial index of public projects
+            statement = statement.where(Projects.private.is_(False))
 
         return statement
 
+    @staticmethod
+    def _visibility_clause(admin: Union[str, List[str], None] = None) -> ColumnElement[bool]:
+        """
+        Create condition that matches public projects and projects of namespaces where user is admin
+
+        :param admin: string or list of admins [e.g. "Khoroshevskyi", or ["doc_adin","Khoroshevskyi"]]
+        :return: sqlalchemy boolean clause
+        """
+        return or_(Projects.private.is_(False), Projects.namespace.in_(tuple_converter(admin)))
+
     @staticmethod
     def _add_date_filter_if_provided(
         statement: Select,
@@ -483,21 +542,14 @@ class PEPDatabaseAnnotation:
         :param admin: True, if user is admin of the namespace [Default: False]
         :return Integer: number of projects in the namepsace
         """
-        if admin is None:
-            admin = []
         statement = (
-            select(func.count()).select_from(Projects).where(Projects.namespace == namespace)
+            select(func.count())
+            .select_from(Projects)
+            .where(Projects.namespace == namespace, self._visibility_clause(admin))
         )
-        statement = statement.where(
-            or_(Projects.private.is_(False), Projects.namespace.in_(admin))
-        )
-
-        result = self._pep_db_engine.session_execute(statement).first()
 
-        try:
-            return result[0]
-        except IndexError:
-            return 0
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
     def get_by_rp_list(
         self,
@@ -515,8 +567,6 @@ class PEPDatabaseAnnotation:
             count:
             result: List [AnnotationModel])
         """
-        admin_tuple = tuple_converter(admin)
-
         if isinstance(registry_paths, list):
             or_statement_list = []
             for path in registry_paths:
@@ -527,10 +577,6 @@ class PEPDatabaseAnnotation:
                             Projects.name == name,
                             Projects.namespace == namespace,
                             Projects.tag == tag,
-                            or_(
-                                Projects.namespace.in_(admin_tuple),
-                                Projects.private.is_(False),
-                            ),
                         )
                     )
                 except RegistryPathError as err:
@@ -545,36 +591,13 @@ class PEPDatabaseAnnotation:
                     results=[],
                 )
 
-            statement = select(Projects).where(or_(*or_statement_list))
-            anno_results = []
-            with Session(self._sa_engine) as session:
-                query_result = session.scalars(statement)
-                for result in query_result:
-                    project_obj = result
-                    annot = AnnotationModel(
-                        namespace=project_obj.namespace,
-                        name=project_obj.name,
-                        tag=project_obj.tag,
-                        is_private=project_obj.private,
-                        description=project_obj.description,
-                        number_of_samples=project_obj.number_of_samples,
-                        submission_date=str(project_obj.submission_date),
-                        last_update_date=str(project_obj.last_update_date),
-                        digest=project_obj.digest,
-                        pep_schema=(
-                            f"{project_obj.schema_mapping.namespace}/{project_obj.schema_mapping.name}"
-                            if project_obj.schema_mapping
-                            else None
-                        ),
-                        pop=project_obj.pop,
-                        stars_number=project_obj.number_of_stars,
-                        forked_from=(
-                            f"{project_obj.forked_from_mapping.namespace}/{project_obj.forked_from_mapping.name}:{project_obj.forked_from_mapping.tag}"
-                            if project_obj.forked_from_mapping
-                            else None
-                        ),
-                    )
-                    anno_results.append(annot)
+            statement = select_annotation().where(
+                or_(*or_statement_list), self._visibility_clause(admin)
+            )
+            with self._sa_engine.connect() as conn:
+                anno_results = [
+                    annotation_from_row(row) for row in conn.execute(statement).mappings()
+                ]
 
             found_dict = {f"{r.namespace}/{r.name}:{r.tag}": r for r in anno_results}
             end_results = [found_dict.get(project) for project in registry_paths]
@@ -646,10 +669,11 @@ class PEPDatabaseAnnotation:
         statement = statement.limit(limit).offset(offset)
         if pep_type:
             statement = statement.where(Projects.pop.is_(pep_type == "pop"))
+        statement = stream_large_page(statement, limit)
 
         results_list = []
-        with Session(self._sa_engine) as session:
-            results = session.execute(statement)
+        with self._sa_engine.connect() as conn:
+            results = conn.execute(statement)
 
             for result in results:
                 results_list.append(
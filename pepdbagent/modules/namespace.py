@@ -19,7 +19,7 @@ from pepdbagent.models import (
     TarNamespaceModel,
     TarNamespaceModelReturn,
 )
-from pepdbagent.utils import tuple_converter
+from pepdbagent.utils import search_count, stream_large_page, tuple_converter
 
 _LOGGER = logging.getLogger(PKG_NAME)
 
@@ -61,34 +61,44 @@ class PEPDatabaseNamespace:
         """
         _LOGGER.info(f"Getting namespaces annotation with provided info: (query: {query})")
         admin_tuple = tuple_converter(admin)
+        count, results = self._search_namespace(
+            search_str=query,
+            admin_nsp=admin_tuple,
+            limit=limit,
+            offset=offset,
+        )
+        count = search_count(
+            count,
+            results,
+            offset,
+            limit,
+            lambda: self._count_namespace(search_str=query, admin_nsp=admin_tuple),
+        )
+
         return NamespaceList(
-            count=self._count_namespace(search_str=query, admin_nsp=admin_tuple),
+            count=count,
             limit=limit,
             offset=offset,
-            results=self._get_namespace(
-                search_str=query,
-                admin_nsp=admin_tuple,
-                limit=limit,
-                offset=offset,
-            ),
+            results=results,
         )
 
-    def _get_namespace(
+    def _search_namespace(
         self,
         search_str: str,
         admin_nsp: tuple = None,
         limit: int = DEFAULT_LIMIT,
         offset: int = DEFAULT_OFFSET,
-    ) -> List[Namespace]:
+    ) -> Tuple[int, List[Namespace]]:
         """
         Search for namespace by providing search string.
+        Total number of found namespaces is calculated in the same query using window function.
 
         :param search_str: string of symbols, words, keywords to search in the
             namespace name.
         :param admin_nsp: tuple of namespaces where project can be retrieved if they are privet
         :param limit: limit of return results
         :param offset: number of results off set (that were already showed)
-        :return: list of dict with structure {
+        :return: tuple of total number of found namespaces and list of dict with structure {
                 namespace,
                 number_of_projects,
                 number_of_samples,
@@ -99,6 +109,7 @@ class PEPDatabaseNamespace:
                 Projects.namespace,
                 func.count(Projects.name).label("number_of_projects"),
                 func.sum(Projects.number_of_samples).label("number_of_samples"),
+                func.count().over().label("total_count"),
             )
             .group_by(Projects.namespace)
             .select_from(Projects)
@@ -110,43 +121,40 @@ class PEPDatabaseNamespace:
             admin_list=admin_nsp,
         )
 
-        statement = statement.limit(limit).offset(offset)
-
-        with Session(self._sa_engine) as session:
-            query_results = session.execute(statement).all()
+        statement = stream_large_page(statement.limit(limit).offset(offset), limit)
 
+        count = 0
         results_list = []
-        for res in query_results:
-            results_list.append(
-                Namespace(
-                    namespace=res.namespace,
-                    number_of_projects=res.number_of_projects,
-                    number_of_samples=res.number_of_samples,
+        with self._sa_engine.connect() as conn:
+            query_results = conn.execute(statement)
+            for res in query_results:
+                count = res.total_count
+                results_list.append(
+                    Namespace.model_construct(
+                        namespace=res.namespace,
+                        number_of_projects=res.number_of_projects,
+                        number_of_samples=res.number_of_samples,
+                    )
                 )
-            )
-        return results_list
+        return count, results_list
 
     def _count_namespace(self, search_str: str = None, admin_nsp: tuple = tuple()) -> int:
         """
-        Get number of found namespace. [This function is related to _get_namespaces]
+        Get number of found namespace. [This function is related to _search_namespace]
 
         :param search_str: string of symbols, words, keywords to search in the
             namespace name.
         :param admin_nsp: tuple of namespaces where project can be retrieved if they are privet
         :return: number of found namespaces
         """
-        statement = select(
-            func.count(distinct(Projects.namespace)).label("number_of_namespaces")
-        ).select_from(Projects)
+        statement = select(func.count(distinct(Projects.namespace))).select_from(Projects)
         statement = self._add_condition(
             statement=statement,
             search_str=search_str,
             admin_list=admin_nsp,
         )
-        with Session(self._sa_engine) as session:
-            query_results = session.execute(statement).one()
-
-        return query_results.number_of_namespaces
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
     @staticmethod
     def _add_condition(
@@ -163,12 +171,8 @@ class PEPDatabaseNamespace:
         :return: sqlalchemy representation of a SELECT statement with where clause.
         """
         if search_str:
-            sql_search_str = f"%{search_str}%"
-            statement = statement.where(
-                or_(
-                    Projects.namespace.ilike(sql_search_str),
-                )
-            )
+            sql_search_str = func.lower(f"%{search_str}%")
+            statement = statement.where(func.lower(Projects.namespace).like(sql_search_str))
         statement = statement.where(
             or_(Projects.private.is_(False), Projects.namespace.in_(admin_list))
         )
@@ -230,9 +234,11 @@ class PEPDatabaseNamespace:
                             number_of_projects: int
                             }
         """
-        with Session(self._sa_engine) as session:
-            results = session.scalars(
-                select(User).limit(limit).order_by(User.number_of_projects.desc())
+        with self._sa_engine.connect() as conn:
+            results = conn.execute(
+                select(User.namespace, User.number_of_projects)
+                .limit(limit)
+                .order_by(User.number_of_projects.desc())
             )
 
             list_of_results = []
@@ -272,9 +278,9 @@ class PEPDatabaseNamespace:
             statement_last_update = statement_last_update.where(Projects.namespace == namespace)
             statement_create_date = statement_create_date.where(Projects.namespace == namespace)
 
-        with Session(self._sa_engine) as session:
-            update_results = session.execute(statement_last_update).all()
-            create_results = session.execute(statement_create_date).all()
+        with self._sa_engine.connect() as conn:
+            update_results = conn.execute(statement_last_update).all()
+            create_results = conn.execute(statement_create_date).all()
 
         if not update_results:
             raise NamespaceNotFoundError(f"Namespace {namespace} not found in the database")
@@ -333,9 +339,16 @@ class PEPDatabaseNamespace:
         :return: list with geo data
         """
 
-        with Session(self._sa_engine) as session:
-            tar_info = session.scalars(
-                select(TarNamespace)
+        with self._sa_engine.connect() as conn:
+            tar_info = conn.execute(
+                select(
+                    TarNamespace.id,
+                    TarNamespace.namespace,
+                    TarNamespace.file_path,
+                    TarNamespace.creation_date,
+                    TarNamespace.number_of_projects,
+                    TarNamespace.file_size,
+                )
                 .where(TarNamespace.namespace == namespace)
                 .order_by(TarNamespace.creation_date.desc())
             )
@@ -12,7 +12,7 @@ from peppy.const import (
     SAMPLE_TABLE_INDEX_KEY,
     SUBSAMPLE_RAW_LIST_KEY,
 )
-from sqlalchemy import Select, and_, delete, select
+from sqlalchemy import Select, and_, delete, exists, select
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.orm import Session
 from sqlalchemy.orm.attributes import flag_modified
@@ -282,6 +282,9 @@ class PEPDatabaseProject:
                 user.number_of_projects -= 1
                 session.commit()
 
+        # forks of the deleted project are changed as well
+        self._pep_db_engine.annotation_cache.clear()
+
     def delete_by_rp(
         self,
         registry_path: str,
@@ -348,7 +351,7 @@ class PEPDatabaseProject:
             )
 
         if not description:
-            description = project.get(description, "")
+            description = proj_dict[CONFIG_KEY].get(DESCRIPTION_KEY) or ""
         proj_dict[CONFIG_KEY][DESCRIPTION_KEY] = description
 
         namespace = namespace.lower()
@@ -545,6 +548,7 @@ class PEPDatabaseProject:
 
                 session.commit()
 
+            self._pep_db_engine.annotation_cache.invalidate((namespace, proj_name, tag))
             _LOGGER.info(f"Project '{namespace}/{proj_name}:{tag}' has been successfully updated!")
             return None
 
@@ -676,6 +680,11 @@ class PEPDatabaseProject:
 
                 session.commit()
 
+            if NAME_KEY in update_values or "tag" in update_values:
+                # forks refer to this project by its registry path
+                self._pep_db_engine.annotation_cache.clear()
+            else:
+                self._pep_db_engine.annotation_cache.invalidate((namespace, name, tag))
             return None
 
         else:
@@ -929,20 +938,17 @@ class PEPDatabaseProject:
         :return: Returning True if project exist
         """
 
-        statement = select(Projects.id)
-        statement = statement.where(
-            and_(
-                Projects.namespace == namespace,
-                Projects.name == name,
-                Projects.tag == tag,
+        statement = select(
+            exists().where(
+                and_(
+                    Projects.namespace == namespace,
+                    Projects.name == name,
+                    Projects.tag == tag,
+                )
             )
         )
-        found_prj = self._pep_db_engine.session_execute(statement).all()
-
-        if len(found_prj) > 0:
-            return True
-        else:
-            return False
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
     @staticmethod
     def _add_samples_to_project(
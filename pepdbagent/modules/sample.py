@@ -168,6 +168,7 @@ class PEPDatabaseSample:
                 project_mapping.last_update_date = datetime.datetime.now(datetime.timezone.utc)
 
                 session.commit()
+                self._pep_db_engine.annotation_cache.invalidate((namespace, name, tag))
             else:
                 raise SampleNotFoundError(
                     f"Sample {namespace}/{name}:{tag}?{sample_name} not found in the database"
@@ -244,6 +245,7 @@ class PEPDatabaseSample:
 
                 session.add(sample_mapping)
                 session.commit()
+                self._pep_db_engine.annotation_cache.invalidate((namespace, name, tag))
 
     def _get_last_sample_guid(self, project_id: int) -> str:
         """
@@ -318,6 +320,7 @@ class PEPDatabaseSample:
                 project_mapping.number_of_samples -= 1
                 project_mapping.last_update_date = datetime.datetime.now(datetime.timezone.utc)
                 session.commit()
+                self._pep_db_engine.annotation_cache.invalidate((namespace, name, tag))
             else:
                 raise SampleNotFoundError(
                     f"Sample {namespace}/{name}:{tag}?{sample_name} not found in the database"
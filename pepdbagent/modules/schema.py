@@ -1,12 +1,20 @@
+import copy
 import logging
 
-from sqlalchemy import Select, and_, delete, func, or_, select
+from sqlalchemy import Connection, Row, Select, and_, delete, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
+from sqlalchemy.orm import Session, load_only, selectinload
 
 from pepdbagent.const import PKG_NAME
-from pepdbagent.db_utils import BaseEngine, SchemaGroupRelations, SchemaGroups, Schemas, User
+from pepdbagent.db_utils import (
+    BaseEngine,
+    Projects,
+    SchemaGroupRelations,
+    SchemaGroups,
+    Schemas,
+    User,
+)
 from pepdbagent.exceptions import (
     SchemaAlreadyExistsError,
     SchemaAlreadyInGroupError,
@@ -21,6 +29,7 @@ from pepdbagent.models import (
     SchemaGroupSearchResult,
     SchemaSearchResult,
 )
+from pepdbagent.utils import search_count, stream_large_page
 
 _LOGGER = logging.getLogger(PKG_NAME)
 
@@ -49,15 +58,16 @@ class PEPDatabaseSchema:
         :return: schema dict
         """
 
-        with Session(self._sa_engine) as session:
-            schema_obj = session.scalar(
-                select(Schemas).where(and_(Schemas.namespace == namespace, Schemas.name == name))
-            )
+        schema_cache = self._pep_db_engine.schema_cache
+        cached = schema_cache.get((namespace, name))
+        if cached is not None:
+            return copy.deepcopy(cached)
 
-            if not schema_obj:
-                raise SchemaDoesNotExistError(f"Schema '{name}' does not exist in the database")
+        with self._sa_engine.connect() as conn:
+            schema = self._get_or_raise(conn, namespace, name, Schemas.schema_json).schema_json
 
-            return schema_obj.schema_json
+        schema_cache.set((namespace, name), copy.deepcopy(schema))
+        return schema
 
     def info(self, namespace: str, name: str) -> SchemaAnnotation:
         """
@@ -74,22 +84,52 @@ class PEPDatabaseSchema:
                     - description: schema description
         """
 
-        with Session(self._sa_engine) as session:
-            schema_obj = session.scalar(
-                select(Schemas).where(and_(Schemas.namespace == namespace, Schemas.name == name))
+        popularity_number = (
+            select(func.count(Projects.id))
+            .where(Projects.schema_id == Schemas.id)
+            .scalar_subquery()
+            .label("popularity_number")
+        )
+        with self._sa_engine.connect() as conn:
+            row = self._get_or_raise(
+                conn,
+                namespace,
+                name,
+                Schemas.namespace,
+                Schemas.name,
+                Schemas.last_update_date,
+                Schemas.submission_date,
+                Schemas.description,
+                popularity_number,
             )
 
-            if not schema_obj:
-                raise SchemaDoesNotExistError(f"Schema '{name}' does not exist in the database")
+        return SchemaAnnotation(
+            namespace=row.namespace,
+            name=row.name,
+            last_update_date=str(row.last_update_date),
+            submission_date=str(row.submission_date),
+            description=row.description,
+            popularity_number=row.popularity_number,
+        )
 
-            return SchemaAnnotation(
-                namespace=schema_obj.namespace,
-                name=schema_obj.name,
-                last_update_date=str(schema_obj.last_update_date),
-                submission_date=str(schema_obj.submission_date),
-                description=schema_obj.description,
-                popularity_number=len(schema_obj.projects_mappings),
-            )
+    @staticmethod
+    def _get_or_raise(conn: Connection, namespace: str, name: str, *columns) -> Row:
+        """
+        Get requested columns of the schema by its unique (namespace, name) key.
+
+        :param conn: sqlalchemy connection
+        :param namespace: user namespace
+        :param name: schema name
+        :param columns: columns (or entities) to select
+
+        :return: row with selected columns
+        """
+        row = conn.execute(
+            select(*columns).where(and_(Schemas.namespace == namespace, Schemas.name == name))
+        ).one_or_none()
+        if row is None:
+            raise SchemaDoesNotExistError(f"Schema '{name}' does not exist in the database")
+        return row
 
     def search(
         self,
@@ -115,19 +155,29 @@ class PEPDatabaseSchema:
         :return: list of schema dicts
         """
 
-        statement = select(Schemas)
+        statement = select(
+            Schemas.namespace,
+            Schemas.name,
+            Schemas.last_update_date,
+            Schemas.submission_date,
+            Schemas.description,
+            func.count().over().label("total_count"),
+        )
         statement = self._add_condition(statement, namespace, search_str)
         statement = statement.limit(limit).offset(offset)
         statement = self._add_order_by_keyword(statement, by=order_by, desc=order_desc)
+        statement = stream_large_page(statement, limit)
 
+        count = 0
         return_list = []
 
-        with Session(self._sa_engine) as session:
-            results = session.scalars(statement)
+        with self._sa_engine.connect() as conn:
+            results = conn.execute(statement)
 
             for result in results:
+                count = result.total_count
                 return_list.append(
-                    SchemaAnnotation(
+                    SchemaAnnotation.model_construct(
                         namespace=result.namespace,
                         name=result.name,
                         last_update_date=str(result.last_update_date),
@@ -137,8 +187,16 @@ class PEPDatabaseSchema:
                     )
                 )
 
+        count = search_count(
+            count,
+            return_list,
+            offset,
+            limit,
+            lambda: self._count_search(namespace=namespace, search_str=search_str),
+        )
+
         return SchemaSearchResult(
-            count=self._count_search(namespace=namespace, search_str=search_str),
+            count=count,
             limit=limit,
             offset=offset,
             results=return_list,
@@ -146,7 +204,7 @@ class PEPDatabaseSchema:
 
     def _count_search(self, namespace: str = None, search_str: str = "") -> int:
         """
-        Count number of found schemas
+        Count number of found schemas. [This function is related to search]
 
         :param namespace: user namespace [Default: None]. If None, search in all namespaces
         :param search_str: query string. [Default: ""]. If empty, return all schemas
@@ -157,10 +215,8 @@ class PEPDatabaseSchema:
 
         statement = self._add_condition(statement, namespace, search_str)
 
-        with Session(self._sa_engine) as session:
-            result = session.execute(statement).one()
-
-            return result[0]
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
     @staticmethod
     def _add_order_by_keyword(
@@ -203,11 +259,11 @@ class PEPDatabaseSchema:
         search_str: str = None,
     ) -> Select:
         if search_str:
-            sql_search_str = f"%{search_str}%"
+            sql_search_str = func.lower(f"%{search_str}%")
             search_query = or_(
-                Schemas.name.ilike(sql_search_str),
-                Schemas.description.ilike(sql_search_str),
-                Schemas.namespace.ilike(sql_search_str),
+                func.lower(Schemas.name).like(sql_search_str),
+                func.lower(Schemas.description).like(sql_search_str),
+                func.lower(Schemas.namespace).like(sql_search_str),
             )
             statement = statement.where(search_query)
         if namespace:
@@ -240,39 +296,39 @@ class PEPDatabaseSchema:
         else:
             description = schema.get("description", "")
 
-        if self.exist(namespace, name):
-            if overwrite:
-                self.update(namespace, name, schema, description)
-                return None
-            elif update_only:
-                self.update(namespace, name, schema, description)
-                return None
-            else:
-                raise SchemaAlreadyExistsError(f"Schema '{name}' already exists in the database")
-
         if update_only:
-            raise SchemaDoesNotExistError(
-                f"Schema '{name}' does not exist in the database"
-                f"Cannot update schema that does not exist"
-            )
+            self.update(namespace, name, schema, description)
+            return None
 
         with Session(self._sa_engine) as session:
-            user = session.scalar(select(User).where(User.namespace == namespace))
-
-            if not user:
-                user = User(namespace=namespace)
-                session.add(user)
-                session.commit()
-
-            schema_obj = Schemas(
+            session.execute(pg_insert(User).values(namespace=namespace).on_conflict_do_nothing())
+            # existing schema is detected by unique (namespace, name) constraint,
+            # in this case no row is returned
+            statement = pg_insert(Schemas).values(
                 namespace=namespace,
                 name=name,
                 schema_json=schema,
                 description=description,
             )
-            session.add(schema_obj)
+            if overwrite:
+                statement = statement.on_conflict_do_update(
+                    index_elements=[Schemas.namespace, Schemas.name],
+                    set_={
+                        "schema_json": statement.excluded.schema_json,
+                        "description": statement.excluded.description,
+                        "last_update_date": func.now(),
+                    },
+                )
+            else:
+                statement = statement.on_conflict_do_nothing()
+            result = session.execute(statement.returning(Schemas.id))
+
+            if result.first() is None:
+                raise SchemaAlreadyExistsError(f"Schema '{name}' already exists in the database")
             session.commit()
 
+        self._pep_db_engine.schema_cache.invalidate((namespace, name))
+
     def update(
         self,
         namespace: str,
@@ -293,19 +349,19 @@ class PEPDatabaseSchema:
         """
 
         with Session(self._sa_engine) as session:
-            schema_obj = session.scalar(
-                select(Schemas).where(and_(Schemas.namespace == namespace, Schemas.name == name))
+            result = session.execute(
+                update(Schemas)
+                .where(and_(Schemas.namespace == namespace, Schemas.name == name))
+                .values(schema_json=schema, description=description)
             )
 
-            if not schema_obj:
+            if result.rowcount == 0:
                 raise SchemaDoesNotExistError(f"Schema '{name}' does not exist in the database")
 
-            schema_obj.schema_json = schema
-            schema_obj.description = description
-            flag_modified(schema_obj, "schema_json")
-
             session.commit()
 
+        self._pep_db_engine.schema_cache.invalidate((namespace, name))
+
     def delete(self, namespace: str, name: str) -> None:
         """
         Delete schema from the database.
@@ -316,18 +372,20 @@ class PEPDatabaseSchema:
         :return: None
         """
 
+        # projects and group relations are updated by foreign key ON DELETE rules
         with Session(self._sa_engine) as session:
-            schema_obj = session.scalar(
-                select(Schemas).where(and_(Schemas.namespace == namespace, Schemas.name == name))
+            result = session.execute(
+                delete(Schemas).where(and_(Schemas.namespace == namespace, Schemas.name == name))
             )
-
-            if not schema_obj:
+            if result.rowcount == 0:
                 raise SchemaDoesNotExistError(f"Schema '{name}' does not exist in the database")
 
-            session.delete(schema_obj)
-
             session.commit()
 
+        self._pep_db_engine.schema_cache.invalidate((namespace, name))
+        # projects that used deleted schema are changed as well
+        self._pep_db_engine.annotation_cache.clear()
+
     def exist(self, namespace: str, name: str) -> bool:
         """
         Check if schema exists in the database.
@@ -338,11 +396,11 @@ class PEPDatabaseSchema:
         :return: True if schema exists, False otherwise
         """
 
-        with Session(self._sa_engine) as session:
-            schema_obj = session.scalar(
-                select(Schemas).where(and_(Schemas.namespace == namespace, Schemas.name == name))
-            )
-            return True if schema_obj else False
+        statement = select(
+            exists().where(and_(Schemas.namespace == namespace, Schemas.name == name))
+        )
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
     def group_create(self, namespace: str, name: str, description: str = "") -> None:
         """
@@ -382,12 +440,26 @@ class PEPDatabaseSchema:
             - schemas: list of SchemaAnnotation objects
         """
 
-        with Session(self._sa_engine) as session:
-            schema_group_obj = session.scalar(
-                select(SchemaGroups).where(
-                    and_(SchemaGroups.namespace == namespace, SchemaGroups.name == name)
+        # all schemas of the group are loaded in one additional query
+        statement = (
+            select(SchemaGroups)
+            .where(and_(SchemaGroups.namespace == namespace, SchemaGroups.name == name))
+            .options(
+                selectinload(SchemaGroups.schema_relation_mapping)
+                .joinedload(SchemaGroupRelations.schema_mapping)
+                .options(
+                    load_only(
+                        Schemas.namespace,
+                        Schemas.name,
+                        Schemas.last_update_date,
+                        Schemas.submission_date,
+                        Schemas.description,
+                    )
                 )
             )
+        )
+        with Session(self._sa_engine) as session:
+            schema_group_obj = session.scalar(statement)
 
             if not schema_group_obj:
                 raise SchemaGroupDoesNotExistError(
@@ -403,7 +475,7 @@ class PEPDatabaseSchema:
                         name=schema_annotation.name,
                         last_update_date=str(schema_annotation.last_update_date),
                         submission_date=str(schema_annotation.submission_date),
-                        desciription=schema_annotation.description,
+                        description=schema_annotation.description,
                     )
                 )
 
@@ -432,18 +504,27 @@ class PEPDatabaseSchema:
             - results: list of SchemaGroupAnnotation objects
         """
 
-        statement = select(SchemaGroups)
+        statement = select(
+            SchemaGroups.namespace,
+            SchemaGroups.name,
+            SchemaGroups.description,
+            func.count().over().label("total_count"),
+        )
         statement = self._add_group_condition(
             statement=statement, namespace=namespace, search_str=search_str
         )
+        statement = statement.order_by(SchemaGroups.id).limit(limit).offset(offset)
+        statement = stream_large_page(statement, limit)
 
-        with Session(self._sa_engine) as session:
-            results = session.scalars(statement)
+        count = 0
+        with self._sa_engine.connect() as conn:
+            results = conn.execute(statement)
 
             return_results = []
             for result in results:
+                count = result.total_count
                 return_results.append(
-                    SchemaGroupAnnotation(
+                    SchemaGroupAnnotation.model_construct(
                         namespace=result.namespace,
                         name=result.name,
                         description=result.description,
@@ -451,8 +532,16 @@ class PEPDatabaseSchema:
                     )
                 )
 
+        count = search_count(
+            count,
+            return_results,
+            offset,
+            limit,
+            lambda: self._group_search_count(namespace, search_str),
+        )
+
         return SchemaGroupSearchResult(
-            count=self._group_search_count(namespace, search_str),
+            count=count,
             limit=limit,
             offset=offset,
             results=return_results,
@@ -472,10 +561,10 @@ class PEPDatabaseSchema:
         :param search_str: Search string to look for schemas. Search in name and description of the group
         """
         if search_str:
-            sql_search_str = f"%{search_str}%"
+            sql_search_str = func.lower(f"%{search_str}%")
             search_query = or_(
-                SchemaGroups.name.ilike(sql_search_str),
-                SchemaGroups.description.ilike(sql_search_str),
+                func.lower(SchemaGroups.name).like(sql_search_str),
+                func.lower(SchemaGroups.description).like(sql_search_str),
             )
             statement = statement.where(search_query)
         if namespace:
@@ -484,7 +573,7 @@ class PEPDatabaseSchema:
 
     def _group_search_count(self, namespace: str = None, search_str: str = ""):
         """
-        Count number of found group of schemas
+        Count number of found group of schemas. [This function is related to group_search]
 
         :param namespace: user namespace [Default: None]. If None, search in all namespaces
         :param search_str: query string. [Default: ""]. If empty, return all schemas
@@ -495,10 +584,8 @@ class PEPDatabaseSchema:
 
         statement = self._add_group_condition(statement, namespace, search_str)
 
-        with Session(self._sa_engine) as session:
-            result = session.execute(statement).one()
-
-            return result[0]
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
     def group_delete(self, namespace: str, name: str) -> None:
         """
@@ -510,17 +597,16 @@ class PEPDatabaseSchema:
         :return: None
         """
 
-        if not self.group_exist(namespace, name):
-            raise SchemaGroupDoesNotExistError(
-                f"Schema group '{name}' does not exist in the database"
-            )
-
         with Session(self._sa_engine) as session:
-            session.execute(
+            result = session.execute(
                 delete(SchemaGroups).where(
                     and_(SchemaGroups.namespace == namespace, SchemaGroups.name == name)
                 )
             )
+            if result.rowcount == 0:
+                raise SchemaGroupDoesNotExistError(
+                    f"Schema group '{name}' does not exist in the database"
+                )
 
             session.commit()
 
@@ -632,10 +718,8 @@ class PEPDatabaseSchema:
         :return: True if schema group exists, False otherwise
         """
 
-        with Session(self._sa_engine) as session:
-            schema_group_obj = session.scalar(
-                select(SchemaGroups).where(
-                    and_(SchemaGroups.namespace == namespace, SchemaGroups.name == name)
-                )
-            )
-            return True if schema_group_obj else False
+        statement = select(
+            exists().where(and_(SchemaGroups.namespace == namespace, SchemaGroups.name == name))
+        )
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
@@ -1,7 +1,8 @@
 import logging
 from typing import Union
 
-from sqlalchemy import and_, delete, select
+from sqlalchemy import CTE, and_, delete, exists, func, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
@@ -9,14 +10,39 @@ from pepdbagent.const import PKG_NAME
 from pepdbagent.db_utils import BaseEngine, Projects, Stars, User
 from pepdbagent.exceptions import (
     ProjectAlreadyInFavorites,
+    ProjectNotFoundError,
     ProjectNotInFavorites,
     UserNotFoundError,
 )
-from pepdbagent.models import AnnotationList, AnnotationModel
+from pepdbagent.models import AnnotationList
+from pepdbagent.modules.annotation import annotation_from_row, select_annotation
 
 _LOGGER = logging.getLogger(PKG_NAME)
 
 
+def _user_id_cte(namespace: str) -> CTE:
+    """
+    Get id of the user, creating the user if it doesn't exist.
+    Existing user is selected instead of being updated with ON CONFLICT DO UPDATE,
+    so its row isn't rewritten and locked on every call.
+
+    :param namespace: user namespace
+    :return: CTE with id column of the user
+    """
+    new_user = (
+        pg_insert(User)
+        .values(namespace=namespace)
+        .on_conflict_do_nothing(index_elements=[User.namespace])
+        .returning(User.id)
+        .cte("new_user")
+    )
+    return (
+        select(new_user.c.id)
+        .union_all(select(User.id).where(User.namespace == namespace))
+        .cte("user_id")
+    )
+
+
 class PEPDatabaseUser:
     """
     Class that represents Project in Database.
@@ -33,17 +59,15 @@ class PEPDatabaseUser:
 
     def create_user(self, namespace: str) -> int:
         """
-        Create new user
+        Create new user. If user already exists, id of existing user is returned
 
         :param namespace: user namespace
         :return: user id
         """
-        new_user_raw = User(namespace=namespace)
-
+        statement = select(_user_id_cte(namespace).c.id)
         with Session(self._sa_engine) as session:
-            session.add(new_user_raw)
+            user_id = session.execute(statement).scalar_one()
             session.commit()
-            user_id = new_user_raw.id
         return user_id
 
     def get_user_id(self, namespace: str) -> Union[int, None]:
@@ -74,30 +98,41 @@ class PEPDatabaseUser:
         :return: None
         """
 
-        user_id = self.get_user_id(namespace)
-
-        if not user_id:
-            user_id = self.create_user(namespace)
-
+        user_cte = _user_id_cte(namespace)
+        star_statement = (
+            pg_insert(Stars)
+            .from_select(
+                ["user_id", "project_id", "star_date"],
+                select(user_cte.c.id, Projects.id, func.now())
+                .join_from(Projects, user_cte, true())
+                .where(
+                    and_(
+                        Projects.namespace == project_namespace,
+                        Projects.name == project_name,
+                        Projects.tag == project_tag,
+                    )
+                ),
+            )
+            .returning(Stars.project_id)
+        )
         try:
             with Session(self._sa_engine) as session:
-                project_mapping = session.scalar(
-                    select(Projects).where(
-                        and_(
-                            Projects.namespace == project_namespace,
-                            Projects.name == project_name,
-                            Projects.tag == project_tag,
-                        )
+                project_id = session.execute(star_statement).scalar_one_or_none()
+                if project_id is None:
+                    raise ProjectNotFoundError(
+                        f"Project {project_namespace}/{project_name}:{project_tag} does not exist"
                     )
+                session.execute(
+                    update(Projects)
+                    .where(Projects.id == project_id)
+                    .values(number_of_stars=Projects.number_of_stars + 1)
                 )
-
-                new_favorites_raw = Stars(user_id=user_id, project_id=project_mapping.id)
-
-                session.add(new_favorites_raw)
-                project_mapping.number_of_stars += 1
                 session.commit()
         except IntegrityError:
             raise ProjectAlreadyInFavorites()
+        self._pep_db_engine.annotation_cache.invalidate(
+            (project_namespace, project_name, project_tag)
+        )
         return None
 
     def remove_project_from_favorites(
@@ -116,32 +151,42 @@ class PEPDatabaseUser:
             f"Removing project {project_namespace}/{project_name}:{project_tag} from favorites in {namespace}"
         )
 
-        user_id = self.get_user_id(namespace)
-
-        with Session(self._sa_engine) as session:
-            project_mapping = session.scalar(
-                select(Projects).where(
-                    and_(
-                        Projects.namespace == project_namespace,
-                        Projects.name == project_name,
-                        Projects.tag == project_tag,
+        delete_statement = (
+            delete(Stars)
+            .where(
+                and_(
+                    Stars.user_id
+                    == select(User.id).where(User.namespace == namespace).scalar_subquery(),
+                    Stars.project_id
+                    == select(Projects.id)
+                    .where(
+                        and_(
+                            Projects.namespace == project_namespace,
+                            Projects.name == project_name,
+                            Projects.tag == project_tag,
+                        )
                     )
+                    .scalar_subquery(),
                 )
             )
-            delete_statement = delete(Stars).where(
-                and_(
-                    Stars.user_id == user_id,
-                    Stars.project_id == project_mapping.id,
+            .returning(Stars.project_id)
+        )
+        with Session(self._sa_engine) as session:
+            project_id = session.execute(delete_statement).scalar_one_or_none()
+            if project_id is not None:
+                session.execute(
+                    update(Projects)
+                    .where(Projects.id == project_id)
+                    .values(number_of_stars=Projects.number_of_stars - 1)
                 )
-            )
-            project_mapping.number_of_stars -= 1
-            result = session.execute(delete_statement)
-            session.commit()
-            row_count = result.rowcount
-        if row_count == 0:
+                session.commit()
+        if project_id is None:
             raise ProjectNotInFavorites(
                 f"Project {project_namespace}/{project_name}:{project_tag} is not in favorites for user {namespace}"
             )
+        self._pep_db_engine.annotation_cache.invalidate(
+            (project_namespace, project_name, project_tag)
+        )
         return None
 
     def get_favorites(self, namespace: str) -> AnnotationList:
@@ -152,41 +197,17 @@ class PEPDatabaseUser:
         :return: list of favorite projects with annotations
         """
         _LOGGER.debug(f"Getting favorites for user {namespace}")
-        if not self.exists(namespace):
-            return AnnotationList(
-                count=0,
-                limit=0,
-                offset=0,
-                results=[],
-            )
-        statement = select(User).where(User.namespace == namespace)
-        with Session(self._sa_engine) as session:
-            query_result = session.scalar(statement)
-            number_of_projects = len([kk.project_mapping for kk in query_result.stars_mapping])
-            project_list = []
-            for prj_list in query_result.stars_mapping:
-                prj = prj_list.project_mapping
-                project_list.append(
-                    AnnotationModel(
-                        namespace=prj.namespace,
-                        name=prj.name,
-                        tag=prj.tag,
-                        is_private=prj.private,
-                        number_of_samples=prj.number_of_samples,
-                        description=prj.description,
-                        last_update_date=str(prj.last_update_date),
-                        submission_date=str(prj.submission_date),
-                        digest=prj.digest,
-                        pep_schema=prj.pep_schema,
-                        pop=prj.pop,
-                        stars_number=prj.number_of_stars,
-                        forked_from=(
-                            f"{prj.forked_from_mapping.namespace}/{prj.forked_from_mapping.name}:{prj.forked_from_mapping.tag}"
-                            if prj.forked_from_mapping
-                            else None
-                        ),
-                    )
-                )
+        # annotations are selected in one query, with the same columns as in annotation search
+        statement = (
+            select_annotation()
+            .join(Stars, Stars.project_id == Projects.id)
+            .join(User, Stars.user_id == User.id)
+            .where(User.namespace == namespace)
+            .order_by(Stars.star_date.desc())
+        )
+        with self._sa_engine.connect() as conn:
+            project_list = [annotation_from_row(row) for row in conn.execute(statement).mappings()]
+        number_of_projects = len(project_list)
         favorite_prj = AnnotationList(
             count=number_of_projects,
             limit=number_of_projects,
@@ -206,18 +227,9 @@ class PEPDatabaseUser:
         :return: Returning True if project exist
         """
 
-        statement = select(User.id)
-        statement = statement.where(
-            and_(
-                User.namespace == namespace,
-            )
-        )
-        found_prj = self._pep_db_engine.session_execute(statement).all()
-
-        if len(found_prj) > 0:
-            return True
-        else:
-            return False
+        statement = select(exists().where(User.namespace == namespace))
+        with self._sa_engine.connect() as conn:
+            return conn.execute(statement).scalar_one()
 
     def delete(self, namespace: str) -> None:
         """
@@ -232,3 +244,5 @@ class PEPDatabaseUser:
         with Session(self._sa_engine) as session:
             session.execute(delete(User).where(User.namespace == namespace))
             session.commit()
+        self._pep_db_engine.annotation_cache.clear()
+        self._pep_db_engine.schema_cache.clear()
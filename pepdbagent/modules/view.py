@@ -1,14 +1,14 @@
 # View of the PEP. In other words, it is a part of the PEP, or subset of the samples in the PEP.
 
 import logging
-from typing import List, Union
+from typing import List, Sequence, Union
 
 import peppy
-from sqlalchemy import and_, delete, select
+from sqlalchemy import and_, bindparam, delete, func, insert, select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from pepdbagent.const import DEFAULT_TAG, PKG_NAME
+from pepdbagent.const import DEFAULT_TAG, INSERT_MANY_VALUES_PAGE_SIZE, PKG_NAME
 from pepdbagent.db_utils import BaseEngine, Projects, Samples, Views, ViewSampleAssociation
 from pepdbagent.exceptions import (
     ProjectNotFoundError,
@@ -22,6 +22,81 @@ from pepdbagent.models import CreateViewDictModel, ProjectViews, ViewAnnotation
 
 _LOGGER = logging.getLogger(PKG_NAME)
 
+# View statements are built once. Values are bound on execution, e.g.:
+# {"namespace": ..., "name": ..., "tag": ..., "view_name": ...}
+# projects are joined explicitly, so project is found by its unique (namespace, name, tag) index
+_PROJECT_CONDITION = and_(
+    Projects.namespace == bindparam("namespace"),
+    Projects.name == bindparam("name"),
+    Projects.tag == bindparam("tag"),
+)
+# unique (name, project_id) constraint of views is not created in existing databases, so they can
+# have views with the same name. Lookups take the first of them.
+_VIEW_CONDITION = and_(_PROJECT_CONDITION, Views.name == bindparam("view_name"))
+_NUMBER_OF_SAMPLES = (
+    select(func.count(ViewSampleAssociation.sample_id))
+    .where(ViewSampleAssociation.view_id == Views.id)
+    .scalar_subquery()
+    .label("number_of_samples")
+)
+
+_VIEW_STATEMENT = select(Views).join(Views.project_mapping).where(_VIEW_CONDITION)
+_VIEW_CONFIG_STATEMENT = (
+    select(Views.id, Projects.config).join(Views.project_mapping).where(_VIEW_CONDITION)
+)
+_VIEW_SAMPLES_STATEMENT = (
+    select(Samples.sample)
+    .join(ViewSampleAssociation, ViewSampleAssociation.sample_id == Samples.id)
+    .where(ViewSampleAssociation.view_id == bindparam("view_id"))
+    .order_by(ViewSampleAssociation.position)
+)
+_VIEW_ID_STATEMENT = (
+    select(Views.id, Views.project_id).join(Views.project_mapping).where(_VIEW_CONDITION)
+)
+_VIEW_ANNOTATION_STATEMENT = (
+    select(Views.name, Views.description, _NUMBER_OF_SAMPLES)
+    .join(Views.project_mapping)
+    .where(_VIEW_CONDITION)
+)
+# sample is removed from the view in one statement, view and sample are found by subqueries
+_REMOVE_SAMPLE_STATEMENT = delete(ViewSampleAssociation).where(
+    ViewSampleAssociation.view_id.in_(
+        select(Views.id).join(Views.project_mapping).where(_VIEW_CONDITION)
+    ),
+    ViewSampleAssociation.sample_id.in_(
+        select(Samples.id)
+        .join(Samples.project_mapping)
+        .where(_PROJECT_CONDITION, Samples.sample_name == bindparam("sample_name"))
+    ),
+)
+_PROJECT_VIEWS_ANNOTATION_STATEMENT = (
+    select(Views.name, Views.description, _NUMBER_OF_SAMPLES)
+    .join(Views.project_mapping)
+    .where(_PROJECT_CONDITION)
+)
+
+
+def _insert_view_samples(session: Session, view_id: int, sample_ids: Sequence[int]) -> None:
+    """
+    Add samples to the view with multi-row INSERT statements of INSERT_MANY_VALUES_PAGE_SIZE rows.
+    Insert executed with a list of parameters is sent by psycopg as one INSERT per row,
+    because nothing is returned from it.
+
+    :param session: sqlalchemy session
+    :param view_id: id of the view
+    :param sample_ids: ids of the samples, in the order they are added to the view
+    :return: None
+    """
+    for start in range(0, len(sample_ids), INSERT_MANY_VALUES_PAGE_SIZE):
+        session.execute(
+            insert(ViewSampleAssociation).values(
+                [
+                    {"sample_id": sample_id, "view_id": view_id}
+                    for sample_id in sample_ids[start : start + INSERT_MANY_VALUES_PAGE_SIZE]
+                ]
+            )
+        )
+
 
 class PEPDatabaseView:
     """
@@ -65,21 +140,17 @@ class PEPDatabaseView:
             }
         """
         _LOGGER.debug(f"Get view {view_name} from {namespace}/{name}:{tag}")
-        view_statement = select(Views).where(
-            and_(
-                Views.project_mapping.has(namespace=namespace, name=name, tag=tag),
-                Views.name == view_name,
-            )
-        )
-
-        with Session(self._sa_engine) as sa_session:
-            view = sa_session.scalar(view_statement)
+        with self._sa_engine.connect() as conn:
+            view = conn.execute(
+                _VIEW_CONFIG_STATEMENT,
+                {"namespace": namespace, "name": name, "tag": tag, "view_name": view_name},
+            ).first()
             if not view:
                 raise ViewNotFoundError(
                     f"View {view_name} of the project {namespace}/{name}:{tag} does not exist"
                 )
-            samples = [sample.sample.sample for sample in view.samples]
-            config = view.project_mapping.config
+            samples = conn.execute(_VIEW_SAMPLES_STATEMENT, {"view_id": view.id}).scalars().all()
+            config = view.config
         sub_project_dict = {"_config": config, "_sample_dict": samples, "_subsample_dict": None}
         if raw:
             return sub_project_dict
@@ -105,15 +176,11 @@ class PEPDatabaseView:
              number_of_samples: int}
         """
         _LOGGER.debug(f"Get annotation for view {view_name} in {namespace}/{name}:{tag}")
-        view_statement = select(Views).where(
-            and_(
-                Views.project_mapping.has(namespace=namespace, name=name, tag=tag),
-                Views.name == view_name,
-            )
-        )
-
-        with Session(self._sa_engine) as sa_session:
-            view = sa_session.scalar(view_statement)
+        with self._sa_engine.connect() as conn:
+            view = conn.execute(
+                _VIEW_ANNOTATION_STATEMENT,
+                {"namespace": namespace, "name": name, "tag": tag, "view_name": view_name},
+            ).first()
             if not view:
                 raise ViewNotFoundError(
                     f"View {name} of the project {namespace}/{name}:{tag} does not exist"
@@ -124,7 +191,7 @@ class PEPDatabaseView:
                 project_tag=tag,
                 name=view.name,
                 description=view.description,
-                number_of_samples=len(view.samples),
+                number_of_samples=view.number_of_samples,
             )
 
     def create(
@@ -154,45 +221,47 @@ class PEPDatabaseView:
         if isinstance(view_dict, dict):
             view_dict = CreateViewDictModel(**view_dict)
 
-        project_statement = select(Projects).where(
+        project_statement = select(Projects.id).where(
             and_(
                 Projects.namespace == view_dict.project_namespace,
                 Projects.name == view_dict.project_name,
                 Projects.tag == view_dict.project_tag,
             )
         )
+        sample_names = list(dict.fromkeys(view_dict.sample_list))
         try:
             with Session(self._sa_engine) as sa_session:
-                project = sa_session.scalar(project_statement)
-                if not project:
+                project_id = sa_session.scalar(project_statement)
+                if project_id is None:
                     raise ProjectNotFoundError(
                         f"Project {view_dict.project_namespace}/{view_dict.project_name}:{view_dict.project_tag} does not exist"
                     )
-                view = Views(
-                    name=view_name,
-                    description=description,
-                    project_mapping=project,
-                )
-                sa_session.add(view)
 
-                for sample_name in view_dict.sample_list:
-                    sample_statement = select(Samples.id).where(
-                        and_(
-                            Samples.project_id == project.id,
-                            Samples.sample_name == sample_name,
-                        )
+                # ids of all samples in the view are retrieved in one query
+                sample_statement = select(Samples.sample_name, Samples.id).where(
+                    and_(
+                        Samples.project_id == project_id,
+                        Samples.sample_name.in_(sample_names),
+                    )
+                )
+                sample_ids = dict(sa_session.execute(sample_statement).all())
+                missing_samples = [name for name in sample_names if name not in sample_ids]
+                if missing_samples and not no_fail:
+                    raise SampleNotFoundError(
+                        f"Samples {missing_samples} do not exist in project {view_dict.project_namespace}/{view_dict.project_name}:{view_dict.project_tag}"
                     )
-                    sample_id_tuple = sa_session.execute(sample_statement).one_or_none()
-                    if sample_id_tuple:
-                        sample_id = sample_id_tuple[0]
-                    elif not sample_id_tuple and not no_fail:
-                        raise SampleNotFoundError(
-                            f"Sample {view_dict.project_namespace}/{view_dict.project_name}:{view_dict.project_tag}:{sample_name} does not exist"
-                        )
-                    else:
-                        continue
 
-                    sa_session.add(ViewSampleAssociation(sample_id=sample_id, view=view))
+                view_id = sa_session.execute(
+                    insert(Views)
+                    .values(name=view_name, description=description, project_id=project_id)
+                    .returning(Views.id)
+                ).scalar_one()
+
+                _insert_view_samples(
+                    sa_session,
+                    view_id,
+                    [sample_ids[name] for name in sample_names if name in sample_ids],
+                )
 
                 sa_session.commit()
         except IntegrityError:
@@ -219,17 +288,16 @@ class PEPDatabaseView:
         _LOGGER.debug(
             f"Deleting view {view_name} from {project_namespace}/{project_name}:{project_tag}"
         )
-        view_statement = select(Views).where(
-            and_(
-                Views.project_mapping.has(
-                    namespace=project_namespace, name=project_name, tag=project_tag
-                ),
-                Views.name == view_name,
-            )
-        )
-
         with Session(self._sa_engine) as sa_session:
-            view = sa_session.scalar(view_statement)
+            view = sa_session.scalar(
+                _VIEW_STATEMENT,
+                {
+                    "namespace": project_namespace,
+                    "name": project_name,
+                    "tag": project_tag,
+                    "view_name": view_name,
+                },
+            )
             if not view:
                 raise ViewNotFoundError(
                     f"View {view_name} of the project {project_namespace}/{project_name}:{project_tag} does not exist"
@@ -260,33 +328,36 @@ class PEPDatabaseView:
         )
         if isinstance(sample_name, str):
             sample_name = [sample_name]
-        view_statement = select(Views).where(
-            and_(
-                Views.project_mapping.has(namespace=namespace, name=name, tag=tag),
-                Views.name == view_name,
-            )
-        )
         try:
             with Session(self._sa_engine) as sa_session:
-                view = sa_session.scalar(view_statement)
+                view = sa_session.execute(
+                    _VIEW_ID_STATEMENT,
+                    {"namespace": namespace, "name": name, "tag": tag, "view_name": view_name},
+                ).first()
                 if not view:
                     raise ViewNotFoundError(
                         f"View {view_name} of the project {namespace}/{name}:{tag} does not exist"
                     )
-                for sample_name_one in sample_name:
-                    sample_statement = select(Samples).where(
-                        and_(
-                            Samples.project_id == view.project_mapping.id,
-                            Samples.sample_name == sample_name_one,
-                        )
+                sample_statement = select(Samples.sample_name, Samples.id).where(
+                    and_(
+                        Samples.project_id == view.project_id,
+                        Samples.sample_name.in_(sample_name),
                     )
-                    sample = sa_session.scalar(sample_statement)
-                    if not sample:
+                )
+                sample_ids = dict(sa_session.execute(sample_statement).all())
+                for sample_name_one in sample_name:
+                    if sample_name_one not in sample_ids:
                         raise SampleNotFoundError(
-                            f"Sample {namespace}/{name}:{tag}:{sample_name} does not exist"
+                            f"Sample {namespace}/{name}:{tag}:{sample_name_one} does not exist"
                         )
 
-                    sa_session.add(ViewSampleAssociation(sample=sample, view=view))
+                # all samples are added in one transaction
+                if sample_ids:
+                    _insert_view_samples(
+                        sa_session,
+                        view.id,
+                        [sample_ids[name] for name in dict.fromkeys(sample_name)],
+                    )
                     sa_session.commit()
         except IntegrityError:
             raise SampleAlreadyInView(
@@ -314,37 +385,20 @@ class PEPDatabaseView:
         _LOGGER.debug(
             f"Removing sample {sample_name} from view {view_name} in {namespace}/{name}:{tag}"
         )
-        view_statement = select(Views).where(
-            and_(
-                Views.project_mapping.has(namespace=namespace, name=name, tag=tag),
-                Views.name == view_name,
-            )
-        )
-
+        view_params = {"namespace": namespace, "name": name, "tag": tag, "view_name": view_name}
         with Session(self._sa_engine) as sa_session:
-            view = sa_session.scalar(view_statement)
-            if not view:
-                raise ViewNotFoundError(
-                    f"View {view_name} of the project {namespace}/{name}:{tag} does not exist"
-                )
-            sample_statement = select(Samples).where(
-                and_(
-                    Samples.project_id == view.project_mapping.id,
-                    Samples.sample_name == sample_name,
-                )
+            result = sa_session.execute(
+                _REMOVE_SAMPLE_STATEMENT, {**view_params, "sample_name": sample_name}
             )
-            sample = sa_session.scalar(sample_statement)
-            if sample.id not in [view_sample.sample_id for view_sample in view.samples]:
+            if result.rowcount == 0:
+                # nothing was deleted, view is checked only to report correct error
+                if sa_session.execute(_VIEW_ID_STATEMENT, view_params).first() is None:
+                    raise ViewNotFoundError(
+                        f"View {view_name} of the project {namespace}/{name}:{tag} does not exist"
+                    )
                 raise SampleNotInViewError(
                     f"Sample {namespace}/{name}:{tag}:{sample_name} does not exist in view {view_name}"
                 )
-            delete_statement = delete(ViewSampleAssociation).where(
-                and_(
-                    ViewSampleAssociation.sample_id == sample.id,
-                    ViewSampleAssociation.view_id == view.id,
-                )
-            )
-            sa_session.execute(delete_statement)
             sa_session.commit()
 
     def get_snap_view(
@@ -362,33 +416,34 @@ class PEPDatabaseView:
         :return: peppy.Project object
         """
         _LOGGER.debug(f"Creating snap view for {namespace}/{name}:{tag}")
-        project_statement = select(Projects).where(
+        project_statement = select(Projects.id, Projects.config).where(
             and_(
                 Projects.namespace == namespace,
                 Projects.name == name,
                 Projects.tag == tag,
             )
         )
-        with Session(self._sa_engine) as sa_session:
-            project = sa_session.scalar(project_statement)
+        with self._sa_engine.connect() as conn:
+            project = conn.execute(project_statement).one_or_none()
             if not project:
                 raise ProjectNotFoundError(f"Project {namespace}/{name}:{tag} does not exist")
-            samples = []
-            for sample_name in sample_name_list:
-                sample_statement = select(Samples).where(
-                    and_(
-                        Samples.project_id == project.id,
-                        Samples.sample_name == sample_name,
-                    )
+            sample_statement = select(Samples.sample_name, Samples.sample).where(
+                and_(
+                    Samples.project_id == project.id,
+                    Samples.sample_name.in_(sample_name_list),
                 )
-                sample = sa_session.scalar(sample_statement)
-                if not sample:
-                    raise SampleNotFoundError(
-                        f"Sample {namespace}/{name}:{tag}:{sample_name} does not exist"
-                    )
-                samples.append(sample.sample)
+            )
+            samples_by_name = dict(conn.execute(sample_statement).all())
             config = project.config
 
+        samples = []
+        for sample_name in sample_name_list:
+            if sample_name not in samples_by_name:
+                raise SampleNotFoundError(
+                    f"Sample {namespace}/{name}:{tag}:{sample_name} does not exist"
+                )
+            samples.append(samples_by_name[sample_name])
+
         if raw:
             return {"_config": config, "_sample_dict": samples, "_subsample_dict": None}
         else:
@@ -408,19 +463,19 @@ class PEPDatabaseView:
         :return: list of views of the project
         """
         _LOGGER.debug(f"Get views annotation for {namespace}/{name}:{tag}")
-        statement = select(Views).where(
-            Views.project_mapping.has(namespace=namespace, name=name, tag=tag),
-        )
         views_list = []
 
-        with Session(self._sa_engine) as session:
-            views = session.scalars(statement)
+        with self._sa_engine.connect() as conn:
+            views = conn.execute(
+                _PROJECT_VIEWS_ANNOTATION_STATEMENT,
+                {"namespace": namespace, "name": name, "tag": tag},
+            )
             for view in views:
                 views_list.append(
                     ViewAnnotation(
                         name=view.name,
                         description=view.description,
-                        number_of_samples=len(view.samples),
+                        number_of_samples=view.number_of_samples,
                     )
                 )
 
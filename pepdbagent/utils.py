@@ -1,13 +1,18 @@
 import datetime
 import json
+import threading
+import time
 import uuid
-from collections.abc import Iterable
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
 from hashlib import md5
-from typing import List, Tuple, Union
+from typing import Any, Callable, List, Optional, Tuple, Union
 
 import ubiquerg
 from peppy.const import SAMPLE_RAW_DICT_KEY
+from sqlalchemy import Select
 
+from pepdbagent.const import STREAM_YIELD_PER
 from pepdbagent.exceptions import RegistryPathError
 
 
@@ -168,5 +173,106 @@ def order_samples(results: dict) -> List[dict]:
     return ordered_sequence
 
 
+def stream_large_page(statement: Select, limit: Optional[int]) -> Select:
+    """
+    Stream rows of the page from server side cursor, if page can be larger than STREAM_YIELD_PER.
+    Smaller pages are fetched at once, because server side cursor needs extra round trips
+    and its queries are not prepared on the server.
+
+    :param statement: select statement of the page
+    :param limit: page size, None if page is not limited
+    :return: statement with streaming execution options if page is large
+    """
+    if limit is None or limit > STREAM_YIELD_PER:
+        return statement.execution_options(yield_per=STREAM_YIELD_PER)
+    return statement
+
+
+def search_count(
+    count: int,
+    results: list,
+    offset: int,
+    limit: Optional[int],
+    count_function: Callable[[], int],
+) -> int:
+    """
+    Get total number of search results. It is counted with window function in the page query,
+    so it is not available when the page is empty. Page can be empty while there are results,
+    if they were skipped by offset or limit is 0. Then they are counted with count_function.
+
+    :param count: total number of results, counted by the page query
+    :param results: results of the page
+    :param offset: offset of the page
+    :param limit: limit of the page
+    :param count_function: function that counts total number of results
+    :return: total number of results
+    """
+    if not results and (offset or not limit):
+        return count_function()
+    return count
+
+
 def generate_guid() -> str:
     return str(uuid.uuid4())
+
+
+class TTLLRUCache:
+    """
+    In-process LRU cache with time to live, keyed by hashable tuples.
+
+    Project annotations are keyed by registry path (namespace, name, tag), so privacy has to be
+    checked by the caller. Schemas are keyed by (namespace, name). Modules that change cached
+    data invalidate corresponding entries, changes made by other processes are visible after
+    ttl expires. Cache with ttl <= 0 is disabled.
+    """
+
+    def __init__(self, ttl: float = 0, maxsize: int = 4096):
+        """
+        :param ttl: time to live of cached entry in seconds
+        :param maxsize: max number of cached entries
+        """
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._ttl > 0 and self._maxsize > 0
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get cached value
+
+        :param key: cache key, e.g. (namespace, name, tag)
+        :return: cached value or None if value is not cached or expired
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._data[key] = (time.monotonic() + self._ttl, value)
+            self._data.move_to_end(key)
+            if len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
@@ -3,6 +3,7 @@ import datetime
 import pytest
 
 from pepdbagent.exceptions import FilterError, ProjectNotFoundError
+from pepdbagent.utils import TTLLRUCache
 
 from .utils import PEPDBAgentContextManager
 
@@ -102,6 +103,12 @@ class TestAnnotation:
             assert result.count == n_projects
             assert len(result.results) == limit
 
+    def test_annotation_count_with_offset_past_last_page(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            result = agent.annotation.get(namespace="namespace1", offset=100)
+            assert result.count == 6
+            assert len(result.results) == 0
+
     @pytest.mark.parametrize(
         "namespace, order_by, first_name",
         [
@@ -298,6 +305,24 @@ class TestAnnotation:
             result = agent.annotation.get_by_rp_list([])
             assert len(result.results) == 0
 
+    def test_get_annotation_by_rp_keeps_order(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            rp_list = [
+                "namespace2/derive:default",
+                "private_test/amendments1:default",
+                "namespace1/amendments1:default",
+            ]
+            result = agent.annotation.get_by_rp(rp_list)
+            assert result.count == 2
+            assert [r.name for r in result.results] == ["derive", "amendments1"]
+
+            result = agent.annotation.get_by_rp(rp_list, admin="private_test")
+            assert [r.namespace for r in result.results] == [
+                "namespace2",
+                "private_test",
+                "namespace1",
+            ]
+
     @pytest.mark.parametrize(
         "namespace, query, found_number",
         [
@@ -323,3 +348,43 @@ class TestAnnotation:
                 search_str=query,
             )
             assert len(result) == found_number
+
+    @pytest.mark.parametrize(
+        "admin, n_projects",
+        [
+            [None, 0],
+            ["private_test", 6],
+            [["private_test", "bbb"], 6],
+        ],
+    )
+    def test_project_number_in_namespace(self, admin, n_projects):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            result = agent.annotation.get_project_number_in_namespace(
+                namespace="private_test", admin=admin
+            )
+            assert result == n_projects
+
+    def test_cached_annotation_is_invalidated_on_update(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            agent.pep_db_engine.annotation_cache = TTLLRUCache(ttl=60)
+            agent.annotation.get(namespace="namespace1", name="amendments1", tag="default")
+            agent.project.update(
+                {"description": "new description"},
+                namespace="namespace1",
+                name="amendments1",
+                tag="default",
+            )
+            result = agent.annotation.get(
+                namespace="namespace1", name="amendments1", tag="default"
+            )
+            assert result.results[0].description == "new description"
+
+    def test_cached_private_annotation_requires_admin(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            agent.pep_db_engine.annotation_cache = TTLLRUCache(ttl=60)
+            result = agent.annotation.get(
+                namespace="private_test", name="amendments1", tag="default", admin="private_test"
+            )
+            assert result.results[0].is_private
+            with pytest.raises(ProjectNotFoundError):
+                agent.annotation.get(namespace="private_test", name="amendments1", tag="default")
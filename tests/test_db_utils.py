@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import text
+
+from pepdbagent import PEPDatabaseAgent
+from pepdbagent.db_utils import MIGRATED_COLUMNS, MIGRATED_INDEXES, TRGM_INDEXES
+
+from .utils import DSN, PEPDBAgentContextManager
+
+
+def pg_trgm_available() -> bool:
+    """
+    Check if pg_trgm extension can be installed in the test database
+    """
+    if not PEPDBAgentContextManager().db_setup():
+        return False
+    with PEPDBAgentContextManager(add_schemas=False) as agent:
+        with agent.pep_db_engine.engine.connect() as conn:
+            return bool(
+                conn.execute(
+                    text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+                ).scalar()
+            )
+
+
+@pytest.mark.skipif(
+    not pg_trgm_available(),
+    reason="DB is not setup or pg_trgm extension is not available",
+)
+class TestTrgmIndexes:
+    """
+    Test creation of pg_trgm search indexes
+    """
+
+    def test_create_trgm_indexes(self):
+        with PEPDBAgentContextManager(add_schemas=False) as agent:
+            agent.pep_db_engine.create_schema()
+            with agent.pep_db_engine.engine.connect() as conn:
+                index_names = conn.execute(text("SELECT indexname FROM pg_indexes")).scalars()
+                assert set(TRGM_INDEXES) <= set(index_names)
+
+
+@pytest.mark.skipif(
+    not PEPDBAgentContextManager().db_setup(),
+    reason="DB is not setup",
+)
+class TestMigratedIndexes:
+    """
+    Test creation of indexes and columns, that are missing in already existing tables
+    """
+
+    def test_create_missing_index(self):
+        with PEPDBAgentContextManager(add_schemas=False) as agent:
+            with agent.pep_db_engine.engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_projects_public_namespace"))
+            agent.pep_db_engine.create_schema()
+            with agent.pep_db_engine.engine.connect() as conn:
+                index_names = conn.execute(text("SELECT indexname FROM pg_indexes")).scalars()
+                assert set(MIGRATED_INDEXES) <= set(index_names)
+
+    def test_add_missing_column(self):
+        with PEPDBAgentContextManager(add_schemas=False) as agent:
+            with agent.pep_db_engine.engine.begin() as conn:
+                conn.execute(text("ALTER TABLE views_samples DROP COLUMN position"))
+            agent.pep_db_engine.create_schema()
+            with agent.pep_db_engine.engine.connect() as conn:
+                columns = conn.execute(
+                    text("SELECT table_name, column_name FROM information_schema.columns")
+                ).all()
+                assert set(MIGRATED_COLUMNS) <= set(map(tuple, columns))
+
+    def test_read_only_role(self):
+        with PEPDBAgentContextManager(add_schemas=False) as agent:
+            with agent.pep_db_engine.engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_projects_public_namespace"))
+                conn.execute(text("CREATE ROLE pepdb_read_only"))
+                conn.execute(
+                    text("GRANT SELECT ON ALL TABLES IN SCHEMA public TO pepdb_read_only")
+                )
+            try:
+                # indexes that can't be created are skipped, instead of failing on init
+                PEPDatabaseAgent(dsn=f"{DSN}?options=-c%20role%3Dpepdb_read_only")
+            finally:
+                with agent.pep_db_engine.engine.begin() as conn:
+                    conn.execute(text("DROP OWNED BY pepdb_read_only"))
+                    conn.execute(text("DROP ROLE pepdb_read_only"))
@@ -1,6 +1,10 @@
 import pytest
 
-from pepdbagent.exceptions import ProjectAlreadyInFavorites, ProjectNotInFavorites
+from pepdbagent.exceptions import (
+    ProjectAlreadyInFavorites,
+    ProjectNotFoundError,
+    ProjectNotInFavorites,
+)
 
 from .utils import PEPDBAgentContextManager
 
@@ -157,6 +161,25 @@ class TestFavorites:
                 else:
                     assert prj_annot.stars_number == 0
 
+    def test_remove_not_favorite_keeps_stars_number(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            agent.user.add_project_to_favorites(
+                "namespace2", "namespace1", "amendments1", "default"
+            )
+            with pytest.raises(ProjectNotInFavorites):
+                agent.user.remove_project_from_favorites(
+                    "namespace1", "namespace1", "amendments1", "default"
+                )
+            result = agent.annotation.get("namespace1", "amendments1", "default")
+            assert result.results[0].stars_number == 1
+
+    def test_add_not_existing_project_to_favorites(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            with pytest.raises(ProjectNotFoundError):
+                agent.user.add_project_to_favorites(
+                    "namespace1", "namespace1", "not_existing", "default"
+                )
+
 
 @pytest.mark.skipif(
     not PEPDBAgentContextManager().db_setup(),
@@ -174,6 +197,13 @@ class TestUser:
 
             assert agent.user.exists("test_user")
 
+    def test_create_existing_user_returns_id(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            user_id = agent.user.create_user("test_user")
+
+            assert agent.user.create_user("test_user") == user_id
+            assert agent.user.get_user_id("test_user") == user_id
+
     def test_delete_user(self):
         with PEPDBAgentContextManager(add_data=True) as agent:
 
@@ -33,6 +33,17 @@ class TestProject:
             )
             assert True
 
+    def test_create_project_description_from_config(self):
+        with PEPDBAgentContextManager(add_data=False) as agent:
+            prj = peppy.Project(list_of_available_peps()["namespace3"]["subtables"])
+            prj_dict = prj.to_dict(extended=True, orient="records")
+            prj_dict["_config"]["description"] = "Frog sequencing experiment"
+            agent.project.create(prj_dict, namespace="test", name="imply")
+
+            result = agent.annotation.get(namespace="test", query="sequencing")
+            assert result.count == 1
+            assert result.results[0].description == "Frog sequencing experiment"
+
     @pytest.mark.parametrize(
         "namespace, name",
         [
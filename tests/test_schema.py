@@ -1,5 +1,12 @@
 import pytest
 
+from pepdbagent.exceptions import (
+    SchemaAlreadyExistsError,
+    SchemaDoesNotExistError,
+    SchemaGroupDoesNotExistError,
+)
+from pepdbagent.utils import TTLLRUCache
+
 from .utils import PEPDBAgentContextManager
 
 
@@ -32,6 +39,8 @@ class TestSchemas:
             assert agent.schema.exist(namespace=namespace, name=name)
             agent.schema.delete(namespace=namespace, name=name)
             assert not agent.schema.exist(namespace=namespace, name=name)
+            with pytest.raises(SchemaDoesNotExistError):
+                agent.schema.delete(namespace=namespace, name=name)
 
     @pytest.mark.parametrize(
         "namespace, name",
@@ -47,6 +56,20 @@ class TestSchemas:
             assert agent.schema.exist(namespace=namespace, name=name)
             assert schema == agent.schema.get(namespace=namespace, name=name)
 
+    def test_cached_schema_is_invalidated(self):
+        with PEPDBAgentContextManager(add_schemas=True) as agent:
+            agent.pep_db_engine.schema_cache = TTLLRUCache(ttl=60)
+            schema = agent.schema.get(namespace="namespace1", name="2.0.0")
+            schema["new"] = "hello"
+            assert "new" not in agent.schema.get(namespace="namespace1", name="2.0.0")
+
+            agent.schema.update(namespace="namespace1", name="2.0.0", schema=schema)
+            assert agent.schema.get(namespace="namespace1", name="2.0.0")["new"] == "hello"
+
+            agent.schema.delete(namespace="namespace1", name="2.0.0")
+            with pytest.raises(SchemaDoesNotExistError):
+                agent.schema.get(namespace="namespace1", name="2.0.0")
+
     @pytest.mark.parametrize(
         "namespace, name",
         [
@@ -97,6 +120,31 @@ class TestSchemas:
             schema_annot = agent.schema.info(namespace=namespace, name=name)
             assert schema_annot.popularity_number == 1
 
+    @pytest.mark.parametrize(
+        "namespace, name",
+        [
+            ["namespace1", "2.0.0"],
+        ],
+    )
+    def test_create_existing(self, namespace, name):
+        with PEPDBAgentContextManager(add_schemas=True) as agent:
+            schema = agent.schema.get(namespace=namespace, name=name)
+            with pytest.raises(SchemaAlreadyExistsError):
+                agent.schema.create(namespace=namespace, name=name, schema=schema)
+
+            schema["new"] = "hello"
+            agent.schema.create(namespace=namespace, name=name, schema=schema, overwrite=True)
+            assert agent.schema.get(namespace=namespace, name=name)["new"] == "hello"
+
+    def test_create_update_only_not_existing(self):
+        with PEPDBAgentContextManager(add_schemas=True) as agent:
+            with pytest.raises(SchemaDoesNotExistError):
+                agent.schema.create(
+                    namespace="new_namespace", name="new", schema={}, update_only=True
+                )
+            agent.schema.create(namespace="new_namespace", name="new", schema={"a": 1})
+            assert agent.schema.get(namespace="new_namespace", name="new") == {"a": 1}
+
     def test_search(self):
         with PEPDBAgentContextManager(add_schemas=True) as agent:
             results = agent.schema.search(namespace="namespace2")
@@ -161,6 +209,8 @@ class TestSchemas:
             assert agent.schema.group_exist(namespace=namespace, name=group_name)
             agent.schema.group_delete(namespace=namespace, name=group_name)
             assert not agent.schema.group_exist(namespace=namespace, name=group_name)
+            with pytest.raises(SchemaGroupDoesNotExistError):
+                agent.schema.group_delete(namespace=namespace, name=group_name)
 
     @pytest.mark.parametrize(
         "namespace, name",
@@ -179,6 +229,10 @@ class TestSchemas:
             )
             group_annot = agent.schema.group_get(namespace=namespace, name=group_name)
             assert group_annot.schemas[0].name == name
+            assert (
+                group_annot.schemas[0].description
+                == agent.schema.info(namespace=namespace, name=name).description
+            )
 
     @pytest.mark.parametrize(
         "namespace, name",
@@ -221,3 +275,14 @@ class TestSchemas:
 
             assert results.count == 2
             assert len(results.results) == 2
+
+            results = agent.schema.group_search(search_str="new_group", limit=1)
+
+            assert results.count == 2
+            assert len(results.results) == 1
+
+    def test_search_offset_past_last_page(self):
+        with PEPDBAgentContextManager(add_schemas=True) as agent:
+            results = agent.schema.search(namespace="namespace2", offset=10)
+            assert results.count == 3
+            assert len(results.results) == 0
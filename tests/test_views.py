@@ -4,6 +4,7 @@ from pepdbagent.exceptions import (
     SampleAlreadyInView,
     SampleNotFoundError,
     SampleNotInViewError,
+    ViewAlreadyExistsError,
     ViewNotFoundError,
 )
 
@@ -50,14 +51,14 @@ class TestViews:
     )
     def test_create_view_with_incorrect_sample(self, namespace, name, sample_name, view_name):
         with PEPDBAgentContextManager(add_data=True) as agent:
-            with pytest.raises(SampleNotFoundError):
+            with pytest.raises(SampleNotFoundError, match="pig_2h.*pig_3h"):
                 agent.view.create(
                     "view1",
                     {
                         "project_namespace": "namespace1",
                         "project_name": "amendments1",
                         "project_tag": "default",
-                        "sample_list": ["pig_0h", "pig_1h", "pig_2h"],
+                        "sample_list": ["pig_0h", "pig_1h", "pig_2h", "pig_3h"],
                     },
                 )
 
@@ -149,6 +150,28 @@ class TestViews:
             agent.view.add_sample(namespace, name, "default", "view1", ["pig_1h", "frog_0h"])
             assert len(agent.view.get(namespace, name, "default", "view1", raw=False).samples) == 3
 
+    def test_view_keeps_sample_order(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            agent.view.create(
+                "view1",
+                {
+                    "project_namespace": "namespace1",
+                    "project_name": "amendments1",
+                    "project_tag": "default",
+                    "sample_list": ["pig_1h", "frog_1h"],
+                },
+            )
+            agent.view.add_sample(
+                "namespace1", "amendments1", "default", "view1", ["pig_0h", "frog_0h"]
+            )
+            view = agent.view.get("namespace1", "amendments1", "default", "view1")
+            assert [sample["sample_name"] for sample in view["_sample_dict"]] == [
+                "pig_1h",
+                "frog_1h",
+                "pig_0h",
+                "frog_0h",
+            ]
+
     @pytest.mark.parametrize(
         "namespace, name, sample_name",
         [
@@ -172,6 +195,10 @@ class TestViews:
 
             with pytest.raises(SampleNotInViewError):
                 agent.view.remove_sample(namespace, name, "default", "view1", sample_name)
+            with pytest.raises(SampleNotInViewError):
+                agent.view.remove_sample(namespace, name, "default", "view1", "not_existing")
+            with pytest.raises(ViewNotFoundError):
+                agent.view.remove_sample(namespace, name, "default", "view2", "pig_1h")
 
     @pytest.mark.parametrize(
         "namespace, name, sample_name",
@@ -229,3 +256,42 @@ class TestViews:
                 },
             )
             assert len(agent.view.get_views_annotation(namespace, name, "default").views) == 1
+            assert (
+                agent.view.get_views_annotation(namespace, name, "default")
+                .views[0]
+                .number_of_samples
+                == 2
+            )
+
+    def test_get_view_annotation(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            agent.view.create(
+                "view1",
+                {
+                    "project_namespace": "namespace1",
+                    "project_name": "amendments1",
+                    "project_tag": "default",
+                    "sample_list": ["pig_0h", "pig_1h"],
+                },
+                description="view description",
+            )
+            view_annotation = agent.view.get_annotation(
+                "namespace1", "amendments1", "default", "view1"
+            )
+            assert view_annotation.description == "view description"
+            assert view_annotation.number_of_samples == 2
+
+            with pytest.raises(ViewNotFoundError):
+                agent.view.get_annotation("namespace1", "amendments1", "default", "view2")
+
+    def test_create_existing_view(self):
+        with PEPDBAgentContextManager(add_data=True) as agent:
+            view_dict = {
+                "project_namespace": "namespace1",
+                "project_name": "amendments1",
+                "project_tag": "default",
+                "sample_list": ["pig_0h"],
+            }
+            agent.view.create("view1", view_dict)
+            with pytest.raises(ViewAlreadyExistsError):
+                agent.view.create("view1", view_dict)